@@ -1,6 +1,6 @@
 from .collection import Collection
-from .typing import ELEMENT, TEXT
+from .typing import ELEMENT, TEXT, EVENT
 from .html import HTMLParser
 from .markdown import MDParser
 
-__all__ = ["Collection", "HTMLParser", "MDParser", "ELEMENT", "TEXT"]
\ No newline at end of file
+__all__ = ["Collection", "HTMLParser", "MDParser", "ELEMENT", "TEXT", "EVENT"]
\ No newline at end of file
@@ -1,4 +1,5 @@
 import typing as t
+import sys
 
 if t.TYPE_CHECKING:
     from ..elements import Symbol
@@ -6,25 +7,35 @@ if t.TYPE_CHECKING:
 class Collection:
     def __init__(self, *symbols:'type[Symbol]'):
         self.symbols = list(symbols)
-        self.cached = False
-        self.qual_names_cache = {}
-
-    @property
-    def qual_keys(self):
-        if self.cached:
-            return self.qual_names_cache
-        
-        self.qual_names_cache = {s.__qualname__.lower(): s for s in self.symbols}
-        self.cached = True
-        return self.qual_names_cache
+        self.qual_keys:'dict[str, type[Symbol]]' = {}
+        self.tag_keys:'dict[str, type[Symbol]]' = {}
+        self.resolve_cache:'dict[str, type[Symbol]]' = {}
+        self.rebuild()
+
+    def rebuild(self):
+        # Later registrations win, matching the order symbols were added in
+        self.qual_keys = {}
+        self.tag_keys = {}
+        for symbol in self.symbols:
+            self.index_symbol(symbol)
+        self.resolve_cache.clear()
+
+    def index_symbol(self, symbol:'type[Symbol]'):
+        self.qual_keys[sys.intern(symbol.__qualname__.lower())] = symbol
+
+        # Only plain string tags can be matched by name, `CustomHTML` symbols are found by their class name
+        html = getattr(symbol, "html", None)
+        if isinstance(html, str) and html:
+            self.tag_keys[sys.intern(html.lower())] = symbol
 
     def add_symbols(self, symbol:'type[Symbol]'):
-        self.cached = False
         self.symbols.append(symbol)
+        self.index_symbol(symbol)
+        self.resolve_cache.clear()
 
     def remove_symbol(self, symbol:'type[Symbol]'):
-        self.cached = False
         self.symbols.remove(symbol)
+        self.rebuild()
 
     @t.overload
     def find_symbol(self, name:'str', raise_errors:'t.Literal[False]'=False) -> 't.Optional[type[Symbol]]': ...
@@ -33,11 +44,20 @@ class Collection:
     def find_symbol(self, name:'str', raise_errors:'t.Literal[True]') -> 't.Union[type[Symbol], t.NoReturn]': ...
 
     def find_symbol(self, name:'str', raise_errors:'bool'=False):
+        # Only names that resolve are cached, so the cache stays bounded by the registered symbols
         lname = name.lower()
-        if lname in self.qual_keys:
-            return self.qual_keys[lname]
-
+        try:
+            symbol = self.resolve_cache[lname]
+        except KeyError:
+            symbol = self.qual_keys.get(lname)
+            if symbol is None:
+                symbol = self.tag_keys.get(lname)
+            if symbol is not None:
+                self.resolve_cache[lname] = symbol
+
+        if symbol is not None:
+            return symbol
 
         if raise_errors:
             raise ValueError(f"Symbol `{name}` not found in collection, if using default symbols it may not be supported.")
-        return None
\ No newline at end of file
+        return None
@@ -1,37 +1,44 @@
-from .typing import ELEMENT, TEXT, ELEMENT_TYPES
+from .typing import ELEMENT, TEXT, EVENT, ELEMENT_TYPES
 from ..typing import ATTRS
 import typing as t
+import sys
 import re
 
 class HTMLParser:
-    NON_PARSING_TAGS = ["script", "style", "textarea", "pre"]
+    NON_PARSING_TAGS = frozenset({"script", "style", "textarea", "pre"})
+    # Closing tags of the non-parsing tags, ASCII-only case folding so `</ſcript>` doesn't close a script
+    CLOSING_TAG_RES = {tag: re.compile(f"</{re.escape(tag)}>", re.IGNORECASE | re.ASCII) for tag in NON_PARSING_TAGS}
+    BLOCK_TAGS = frozenset(ELEMENT_TYPES["block"])
+    INLINE_TAGS = frozenset(ELEMENT_TYPES["inline"])
+    VOID_TAGS = frozenset(ELEMENT_TYPES["void"])
     WS_RE = re.compile(r"\s+")
+    # Inside tags only ASCII whitespace separates tokens, as in the HTML spec
+    TAG_NAME_RE = re.compile(r"([^ \t\n\r\f>]*)[ \t\n\r\f]*")
+    ATTR_RE = re.compile(
+        r"([^ \t\n\r\f=>]*)[ \t\n\r\f]*"
+        r"(?:=[ \t\n\r\f]*(?:\"([^\"]*)\"?|'([^']*)'?|`([^`]*)`?|([^ \t\n\r\f>]*)))?"
+        r"[ \t\n\r\f]*"
+    )
 
     def __init__(self):
         self.reset()
 
-    @property
-    def children(self):
-        return self.current_tag["children"]
-
     def reset(self):
         self.dom: 'list[ELEMENT|TEXT]' = []
-        self.buffer = ""
-        self.state = ""
-        self.current_tag = {
+        self.root: 'ELEMENT' = {
             "type": "element",
             "name": "dom",
             "attributes": {},
-            "children": self.dom,
-            "parent": None
+            "children": self.dom
         }
-        self.tag = ""
-        self.non_parsing_content = ""
-        self.in_non_parsing_tag = False
-        self.current_non_parsing_tag = None
+        self.current_tag = self.root
+        # Open elements below the root, `current_tag` is the last one (or the root when empty)
+        self.tag_stack: 'list[ELEMENT]' = []
+        # Children list of `current_tag`, kept in step with it while parsing
+        self.children: 'list[ELEMENT|TEXT]' = self.dom
 
+    @staticmethod
     def create_element(
-        self,
         name: 'str',
         attrs: 'ATTRS' = None,
         children: 'list[ELEMENT|TEXT]' = None
@@ -46,11 +53,11 @@ class HTMLParser:
             "type": "element",
             "name": name,
             "attributes": attrs,
-            "children": children,
-            "parent": self.current_tag
+            "children": children
         }
 
-    def create_text(self, content: 'str') -> 'TEXT':
+    @staticmethod
+    def create_text(content: 'str') -> 'TEXT':
         return {
             "type": "text",
             "content": content,
@@ -59,64 +66,197 @@ class HTMLParser:
 
     def parse(self, html: 'str') -> 'list[ELEMENT]':
         self.reset()
-        i = 0
+        create_element = self.create_element
+        create_text = self.create_text
+        process_text_node = self.process_text_node
+        trim_block_element_whitespace = self.trim_block_element_whitespace
+        block_tags = self.BLOCK_TAGS
+        void_tags = self.VOID_TAGS
+        root = self.root
+        tag_stack = self.tag_stack
+        # The open element and its children list, kept as locals and written back on return
+        current_tag = root
+        children = self.dom
+
+        for event in self.events(html):
+            kind = event[0]
+            if kind == "text":
+                # Process text according to current tag type
+                processed_text = process_text_node(event[1], current_tag["name"])
+                if processed_text:
+                    children.append(create_text(processed_text))
+
+            elif kind == "open":
+                _, name, attrs, is_self_closing = event
+                tag = create_element(name, attrs)
+                children.append(tag)
+                if not (is_self_closing or name.lower() in void_tags):
+                    tag_stack.append(tag)
+                    current_tag = tag
+                    children = tag["children"]
+
+            elif kind == "close":
+                if tag_stack:
+                    # After closing a block element, trim first/last newlines in children
+                    if current_tag["name"] in block_tags:
+                        trim_block_element_whitespace(current_tag)
+                    tag_stack.pop()
+                    current_tag = tag_stack[-1] if tag_stack else root
+                    children = current_tag["children"]
+
+            elif kind == "raw":
+                # Unparsed content of a non-parsing tag, which it also closes
+                children.append(create_text(event[1]))
+                # Never pop the root `dom` element
+                if tag_stack:
+                    tag_stack.pop()
+                current_tag = tag_stack[-1] if tag_stack else root
+                children = current_tag["children"]
+
+            elif kind == "comment":
+                children.append(create_element("comment", children=[create_text(event[1])]))
+
+        self.current_tag = current_tag
+        self.children = children
+        return self.dom
 
-        while i < len(html):
-            char = html[i]
-            if self.in_non_parsing_tag:
-                closing_tag = f"</{self.current_non_parsing_tag}>"
-                if html[i:i+len(closing_tag)].lower() == closing_tag.lower():
-                    # Found closing tag, create element with unparsed content
-                    self.children.append(self.create_text(self.non_parsing_content))
-                    self.current_tag = self.current_tag["parent"]
-
-                    self.in_non_parsing_tag = False
-                    self.current_non_parsing_tag = None
-                    self.non_parsing_content = ""
-                    i += len(closing_tag)
-                else:
-                    self.non_parsing_content += char
-                    i += 1
-                continue
-
-            elif char == '<':
-                if self.buffer:
-                    # Process buffer according to current tag type
-                    processed_text = self.process_text_node(
-                        self.buffer, self.current_tag["name"]
-                    )
-                    if processed_text:
-                        self.children.append(self.create_text(processed_text))
-                    self.buffer = ""
+    def events(
+        self,
+        html: 'str',
+        final: 'bool' = True,
+        scan_from: 'int' = 0,
+        resume: 'tuple[int, str]' = (0, "")
+    ) -> 't.Generator[EVENT, None, tuple[int, tuple[int, str]]]':
+        """
+        Tokenize `html` into a stream of events without building a DOM.
+
+        Yields `("open", name, attrs, is_self_closing)`, `("close", name)`, `("text", text)`,
+        `("raw", content)` for the content of a non-parsing tag (closing it), `("comment", text)` and
+        `("declaration", text)` for `<!...>` declarations such as a doctype.
+        Text is yielded as it appears in the source, whitespace is only processed by `parse`.
+
+        With `final` set to False `html` may be cut short, scanning stops before the first token more
+        input could still extend. The generator returns that position, and for an opening tag where to resume
+        scanning it: the offset of the attribute it stopped in (or of its `>` when only the closing tag of a
+        non-parsing element is missing) and the quote of an attribute value it stopped inside, `(0, "")` otherwise.
+
+        When `html` continues input an earlier call stopped short on, `scan_from` is where the new input
+        starts and `resume` is what that call returned, the search for the end of the unfinished token
+        picks up from there instead of rescanning it.
+        """
+        i = 0
+        length = len(html)
+        find = html.find
+        startswith = html.startswith
+        read_comment = self.read_comment
+        read_closing_tag = self.read_closing_tag
+        read_opening_tag = self.read_opening_tag
+        scan_opening_tag = self.scan_opening_tag
+        find_closing_tag = self.find_closing_tag
+        tag_name_match = self.TAG_NAME_RE.match
+        non_parsing_tags = self.NON_PARSING_TAGS
+
+        while i < length:
+            if html[i] == '<':
+                # A lone `<` at the end could still become any kind of tag
+                if not final and i + 1 == length:
+                    return i, (0, "")
 
                 # Check for comment
-                if html[i:i+4] == '<!--':
-                    i = self.handle_comment(html, i + 4)
+                if startswith('<!--', i):
+                    # A comment can't be complete until its `-->` arrives, which may straddle old and new input
+                    if not final and find('-->', max(i + 4, scan_from - 2)) == -1:
+                        return i, (0, "")
+                    comment, end = read_comment(html, i + 4)
+                    yield ("comment", comment)
+                elif html[i + 1] == '!':
+                    # Declaration such as `<!DOCTYPE html>`, skip straight to its `>`
+                    end = find('>', max(i + 2, scan_from))
+                    if end == -1:
+                        if not final:
+                            return i, (0, "")
+                        end = length
+                    yield ("declaration", html[i + 2:end])
+                    end += 1
                 elif html[i + 1] == '/':
                     # Closing tag
-                    i = self.handle_closing_tag(html, i + 2)
-                    if self.current_tag["parent"] is not None:
-                        # After closing a block element, trim first/last newlines in children
-                        if self.is_block_element(self.current_tag["name"]):
-                            self.trim_block_element_whitespace(self.current_tag)
-                        self.current_tag = self.current_tag["parent"]
+                    if not final and find('>', max(i + 2, scan_from)) == -1:
+                        return i, (0, "")
+                    tag, end = read_closing_tag(html, i + 2)
+                    yield ("close", tag)
                 else:
                     # Opening tag
-                    i = self.handle_opening_tag(html, i + 1)
-                    # Check if we entered a non-parsing tag
-                    if self.tag.lower() in self.NON_PARSING_TAGS:
-                        self.in_non_parsing_tag = True
-                        self.current_non_parsing_tag = self.tag
+                    if not final:
+                        # Find where it ends before reading it, resuming where an earlier call stopped in it
+                        at, quote = resume if i == 0 else (0, "")
+                        if at and html[at] == '>':
+                            # Complete already, only the closing tag of its non-parsing element was missing
+                            end = at + 1
+                        else:
+                            # Outside a quoted value the tag can't be complete until a `>` arrives
+                            if not quote and find('>', max(i + 1, scan_from)) == -1:
+                                return i, (at, quote)
+                            end, at, quote = scan_opening_tag(html, at or tag_name_match(html, i + 1).end(), quote, scan_from)
+                            if end == -1:
+                                return i, (at - i, quote)
+
+                        tag = tag_name_match(html, i + 1).group(1)
+                        # Resume early enough to catch a closing tag split across the old and new input
+                        if tag.lower() in non_parsing_tags and find_closing_tag(html, max(end, scan_from - len(tag) - 2), tag) is None:
+                            return i, (end - 1 - i, "")
+
+                    tag, attrs, is_self_closing, end = read_opening_tag(html, i + 1)
+
+                    if tag.lower() in non_parsing_tags:
+                        # Non-parsing tags run unparsed up to their closing tag
+                        closing_tag = find_closing_tag(html, max(end, scan_from - len(tag) - 2), tag)
+                        if closing_tag is None:
+                            # Unterminated, the rest of the document is dropped
+                            yield ("open", tag, attrs, is_self_closing)
+                            return length, (0, "")
+
+                        yield ("open", tag, attrs, is_self_closing)
+                        yield ("raw", html[end:closing_tag.start()])
+                        end = closing_tag.end()
+                    else:
+                        yield ("open", tag, attrs, is_self_closing)
+                i = end
             else:
-                self.buffer += char
-                i += 1
-
-        if self.buffer:
-            processed_text = self.process_text_node(self.buffer, self.current_tag["name"])
-            if processed_text:
-                self.children.append(self.create_text(processed_text))
+                # Consume the whole text run up to the next tag in one slice
+                end = find('<', max(i, scan_from))
+                if end == -1:
+                    if not final:
+                        return i, (0, "")
+                    end = length
+                yield ("text", html[i:end])
+                i = end
+
+        return i, (0, "")
+
+    def iter_events(self, chunks: 't.Iterable[str]') -> 't.Iterator[EVENT]':
+        """
+        Tokenize a document arriving in pieces, e.g. read from a file or socket, into the same events as `events`.
 
-        return self.dom
+        Events are yielded as soon as the tokens they come from are complete, only the unfinished tail
+        of the input is held between chunks.
+        """
+        pending = ""
+        resume = (0, "")
+        for chunk in chunks:
+            # `pending` was already scanned up to its old end, only the new chunk needs searching
+            scan_from = len(pending)
+            pending += chunk
+            end, resume = yield from self.events(pending, final=False, scan_from=scan_from, resume=resume)
+            pending = pending[end:]
+
+        yield from self.events(pending, scan_from=len(pending))
+
+    @classmethod
+    def find_closing_tag(cls, html: 'str', start: 'int', tag: 'str') -> 't.Optional[re.Match[str]]':
+        pattern = cls.CLOSING_TAG_RES.get(tag.lower())
+        if pattern is None:
+            pattern = re.compile(f"</{re.escape(tag)}>", re.IGNORECASE | re.ASCII)
+        return pattern.search(html, start)
 
     def process_text_node(self, text: str, parent_tag: str) -> str:
         """
@@ -126,26 +266,20 @@ class HTMLParser:
         if parent_tag in self.NON_PARSING_TAGS:
             return text
 
-        if self.is_block_element(parent_tag):
-            collapsed = self.WS_RE.sub(" ", text)
-            return collapsed.strip()
-
         if self.is_inline_element(parent_tag):
-            collapsed = self.WS_RE.sub(" ", text)
-            return collapsed
+            return self.WS_RE.sub(" ", text)
 
-        # For unknown tags, default to collapsing whitespace
-        collapsed = re.sub(r'\s+', ' ', text)
-        return collapsed.strip()
+        # Block and unknown tags collapse and strip in one pass, whitespace-only text comes out empty and is dropped
+        return " ".join(text.split())
 
     def is_block_element(self, tag: str) -> bool:
-        return tag in ELEMENT_TYPES.get("block", [])
+        return tag in self.BLOCK_TAGS
 
     def is_inline_element(self, tag: str) -> bool:
-        return tag in ELEMENT_TYPES.get("inline", [])
+        return tag in self.INLINE_TAGS
 
     def is_void_element(self, tag: str) -> bool:
-        return tag in ELEMENT_TYPES.get("void", [])
+        return tag in self.VOID_TAGS
 
     def trim_block_element_whitespace(self, element: 'ELEMENT'):
         """
@@ -174,103 +308,86 @@ class HTMLParser:
                     child["content"] = content[:-1]
                 break  # Only last text node
 
-    def handle_opening_tag(self, html: 'str', start: 'int') -> 'int':
-        i = start
-        self.tag = ""
+    def read_opening_tag(self, html: 'str', start: 'int') -> 'tuple[str, ATTRS, bool, int]':
         attrs: 'dict[str, t.Union[str, bool, int, float]]' = {}
-
-        # Get tag name
-        while i < len(html) and not html[i].isspace() and html[i] != '>':
-            self.tag += html[i]
-            i += 1
-
-        # Skip whitespace
-        while i < len(html) and html[i].isspace():
-            i += 1
-
-        # Parse attributes
-        while i < len(html) and html[i] != '>' and html[i:i+1] != '/>':
-            if html[i].isspace():
+        length = len(html)
+        attr_match = self.ATTR_RE.match
+        intern = sys.intern
+
+        # Get tag name and skip the whitespace after it
+        match = self.TAG_NAME_RE.match(html, start)
+        tag = intern(match.group(1))
+        i = match.end()
+
+        # Parse attributes, one `ATTR_RE` match per attribute
+        while i < length and html[i] != '>':
+            # Self-closing `/>`, stop on the `>` without reading `/` as an attribute
+            if html.startswith("/>", i):
                 i += 1
-                continue
-
-            # Get attribute name
-            attr = ""
-            while i < len(html) and not html[i].isspace() and html[i] != '=' and html[i] != '>':
-                attr += html[i]
-                i += 1
-
-            if attr == "/" and html[i-1:i+1] == "/>":
                 break
 
-            # Skip whitespace
-            while i < len(html) and html[i].isspace():
-                i += 1
-
-            value = True  # Default for boolean attributes
-
-            # Get attribute value if it exists
-            if i < len(html) and html[i] == '=':
-                i += 1
-                # Skip whitespace
-                while i < len(html) and html[i].isspace():
-                    i += 1
-
-                quote = html[i] if html[i] in '"\'`' else None
-                if quote:
-                    i += 1
-                    value = ""
-                    while i < len(html) and html[i] != quote:
-                        value += html[i]
-                        i += 1
-                    i += 1  # Skip closing quote
-                else:
-                    value = ""
-                    while i < len(html) and not html[i].isspace() and html[i] != '>':
-                        value += html[i]
-                        i += 1
+            match = attr_match(html, i)
+            i = match.end()
 
+            attr = match.group(1)
             if attr:
-                attrs[attr] = value
-
-            # Skip whitespace
-            while i < len(html) and html[i].isspace():
-                i += 1
+                # Groups 2-5 hold the value in whichever quoting was used, boolean attributes have none
+                attrs[intern(attr)] = match.group(match.lastindex) if match.lastindex > 1 else True
 
         # Handle self-closing tags
-        tag = self.create_element(self.tag, attrs)
         is_self_closing = html[i-1] == '/'
-        if is_self_closing or self.is_void_element(self.tag.lower()):
-            self.children.append(tag)
-        else:
-            self.children.append(tag)
-            self.current_tag = tag
-
-        return i + 1
-
-    def handle_closing_tag(self, html: 'str', start: 'int') -> 'int':
-        i = start
-        tag = ""
-
-        # Get tag name
-        while i < len(html) and html[i] != '>':
-            tag += html[i]
-            i += 1
-        self.tag = tag
-        return i + 1
+        return tag, attrs, is_self_closing, i + 1
 
-    def handle_comment(self, html: 'str', start: 'int') -> 'int':
-        i = start
-        comment = ""
+    def scan_opening_tag(self, html: 'str', i: 'int', quote: 'str', scan_from: 'int') -> 'tuple[int, int, str]':
+        """
+        Find the end of an opening tag from `i`, where one of its attributes starts, without building it.
 
+        Returns the position past its `>`, or -1 when the input runs out first, with the attribute to resume
+        from and the quote of a value it ran out inside (empty otherwise). Given such a `quote`, the value's
+        closing quote is only searched for from `scan_from`.
+        """
+        length = len(html)
+        attr_match = self.ATTR_RE.match
+
+        if quote:
+            close = html.find(quote, scan_from)
+            if close == -1:
+                return -1, i, quote
+            # Only whitespace is left of that attribute, `ATTR_RE` skips it as an attribute without a name
+            i = close + 1
+
+        # The same steps as `read_opening_tag`
+        while i < length and html[i] != '>':
+            if html.startswith("/>", i):
+                return i + 2, i, ""
+
+            match = attr_match(html, i)
+            end = match.end()
+            if end == length:
+                group = match.lastindex
+                if group is not None and 2 <= group <= 4 and match.end(group) == length:
+                    # Cut off inside a quoted value
+                    return -1, i, html[match.start(group) - 1]
+                # The attribute could still grow, scan it again
+                return -1, i, ""
+            i = end
+
+        if i >= length:
+            return -1, i, ""
+        return i + 1, i, ""
+
+    def read_closing_tag(self, html: 'str', start: 'int') -> 'tuple[str, int]':
+        # Get tag name, everything up to the next `>`
+        end = html.find('>', start)
+        if end == -1:
+            end = len(html)
+        return sys.intern(html[start:end]), end + 1
+
+    def read_comment(self, html: 'str', start: 'int') -> 'tuple[str, int]':
         # Get comment content until -->
-        while i < len(html) - 2:
-            if html[i:i+3] == '-->':
-                break
-            comment += html[i]
-            i += 1
-
-        # Create comment element
-        self.children.append(self.create_element("comment", children=[self.create_text(comment)]))
+        end = html.find('-->', start)
+        if end == -1:
+            # Unterminated, the comment stops short of the last two characters
+            end = max(start, len(html) - 2)
 
-        return i + 3  # Skip past -->
+        return html[start:end], end + 3  # Skip past -->
\ No newline at end of file
@@ -5,16 +5,14 @@ from .extension import Extension
 if t.TYPE_CHECKING:
     from ..parser import MDParser
     from ...typing import ELEMENT, TEXT
-    from ..typing import ELM_TYPE_W_END, ELM_TYPE_WO_END, OL_LIST, UL_LIST, LIST_ITEM, LIST_TYPE, OL_TYPE, UL_TYPE
+    from ..typing import ELM_TYPE_W_END, ELM_TYPE_WO_END, OL_LIST, UL_LIST
 
 
+ESCAPE_RE = re.compile(r'\\(.)')
+
 def unescape(text: str) -> 'str':
     """Unescape text."""
-    for i in range(len(text)):
-        m = re.match(r'^\\(.)', text[i:])
-        if m:
-            text = text[:i] + m.group(1) + text[i + m.end(0):]
-    return text
+    return ESCAPE_RE.sub(r'\1', text)
 
 def dequote(text: str) -> str:
     """Remove quotes from text."""
@@ -32,6 +30,34 @@ def char_isin(text, pattern):
 
 
 class BaseExtension(Extension):
+    BLOCKQUOTE_RE = re.compile(r"^> (.*)$")
+    CODE_RE = re.compile(r"^```([A-Za-z]*)?$")
+    H_RE = re.compile(r"^(#{1,6})(?: (.*))?$")
+    HR_RE = re.compile(r"^---+$")
+    BR_RE = re.compile(r"^\s*$")
+    UL_RE = re.compile(r"^(\s*)(-|\+|\*)(?: +(?:\[( |x|X)\])?(.*))?$")
+    OL_RE = re.compile(r"^(\s*)(\d)(\.|\))(?: +(?:\[( |x|X)\] *)?(.*))?$")
+    THEAD_RE = re.compile(r"^\|(?::?-+:?\|)+$")
+    TR_RE = re.compile(r"^\|(?:[^|\n]+\|)+$")
+    CELL_SPLIT_RE = re.compile(r"(?<!\\)\|")
+    TITLE_RE = re.compile(r"^title:(?: (.+))?$")
+
+    INLINE_LINK_RE = re.compile(r"(?<!!)\[")
+    AUTOMATIC_LINK_RE = re.compile(r"^<([^>]+)>")
+    REFERENCE_DEFINITION_RE = re.compile(r"^\[([^\]]+)\]:\s*([^\s]+)")
+    REFERENCE_RE = re.compile(r"^\[([^\]]+)\]\[([^\]]+)\]\s*")
+    IMAGE_RE = re.compile(r"^!\[")
+    BOLD_AND_ITALIC_RES = (
+        re.compile(r"^([\*_])([\*_]){2}([^\*\n\r]+?)\2{2}\1"),
+        re.compile(r"^([\*_]){2}([\*_])([^\*\n\r]+?)\2\1{2}")
+    )
+    BOLD_RE = re.compile(r"^([\*_])\1{1}(.+?)\1{2}")
+    ITALIC_RE = re.compile(r"^([\*_])([^\*\n\r]+?)\1")
+    CODE_SPAN_RE = re.compile(r"^(`+)([\s\S]*?)\1")
+
+    # Shared heading tag names, instead of formatting a new string for every heading
+    HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
     @property
     def name(self):
         return "Base Extension"
@@ -45,57 +71,58 @@ class BaseExtension(Extension):
         self.list_stack:'list[t.Union[OL_LIST, UL_LIST]]' = []
         self.code_index = 0
         self.pre_dom = []
+        self.subparser:'t.Optional[MDParser]' = None
 
     @property
     def top_level_tags(self) -> 'dict[str, ELM_TYPE_W_END | ELM_TYPE_WO_END]':
         return {
             "blockquote": {
-                "pattern": r"^> (.*)$",
+                "pattern": self.BLOCKQUOTE_RE,
                 "handler": self.handle_blockquote,
                 "end": self.end_blockquote
             },
             "code": {
-                "pattern": r"^```([A-Za-z]*)?$",
+                "pattern": self.CODE_RE,
                 "handler": self.handle_code,
                 "end": self.end_code
             },
             "h": {
-                "pattern": r"^(#{1,6})(?: (.*))?$",
+                "pattern": self.H_RE,
                 "handler": self.handle_h,
                 "end": None
             },
             "hr": {
-                "pattern": r"^---+$",
+                "pattern": self.HR_RE,
                 "handler": self.handle_hr,
                 "end": None
             },
             "br": {
-                "pattern": r"^\s*$",
+                "pattern": self.BR_RE,
                 "handler": self.handle_br,
                 "end": None
             },
             "ul": {
-                "pattern": r"^(\s*)(-|\+|\*)(?: +(?:\[( |x|X)\])?(.*))?$",
+                "pattern": self.UL_RE,
                 "handler": self.handle_ul,
                 "end": self.end_list
             },
             "ol": {
-                "pattern": r"^(\s*)(\d)(\.|\))(?: +(?:\[( |x|X)\] *)?(.*)?)?$",
+                "pattern": self.OL_RE,
                 "handler": self.handle_ol,
                 "end": self.end_list
             },
             "thead": {
-                "pattern": r"^\|(?::?-+:?\|)+$",
+                "pattern": self.THEAD_RE,
                 "handler": self.handle_thead,
                 "end": self.end_table
             },
             "tr": {
-                "pattern": r"^\|(?:[^|\n]+\|)+$",
+                "pattern": self.TR_RE,
                 "handler": self.handle_tr,
                 "end": self.end_table
             },
             "title": {
-                "pattern": r"^title:(?: (.+))?$",
+                "pattern": self.TITLE_RE,
                 "handler": self.handle_title,
                 "end": None
             }
@@ -105,40 +132,49 @@ class BaseExtension(Extension):
     def text_tags(self):
         return {
             "inline_link": {
-                "pattern": r"(?<!!)\[",
-                "handler": self.inline_link
+                "pattern": self.INLINE_LINK_RE,
+                "handler": self.inline_link,
+                "start": "["
             },
             "automatic_link": {
-                "pattern": r"^<([^>]+)>",
-                "handler": self.automatic_link
+                "pattern": self.AUTOMATIC_LINK_RE,
+                "handler": self.automatic_link,
+                "start": "<"
             },
             "reference_definition": {
-                "pattern": r"^\[([^\]]+)\]:\s*([^\s]+)",
-                "handler": self.reference_definition
+                "pattern": self.REFERENCE_DEFINITION_RE,
+                "handler": self.reference_definition,
+                "start": "["
             },
             "reference": {
-                "pattern": r"^\[([^\]]+)\]\[([^\]]+)\]\s*",
-                "handler": self.reference
+                "pattern": self.REFERENCE_RE,
+                "handler": self.reference,
+                "start": "["
             },
             "image": {
-                "pattern": r"^!\[",
-                "handler": self.image
+                "pattern": self.IMAGE_RE,
+                "handler": self.image,
+                "start": "!"
             },
             "bold_and_italic": {
-                "pattern": [r"^([\*_])([\*_]){2}([^\*\n\r]+?)\2{2}\1", r"^([\*_]){2}([\*_])([^\*\n\r]+?)\2\1{2}"],
-                "handler": self.bold_and_italic
+                "pattern": list(self.BOLD_AND_ITALIC_RES),
+                "handler": self.bold_and_italic,
+                "start": "*_"
             },
             "bold": {
-                "pattern": r"^([\*_])\1{1}(.+?)\1{2}",
-                "handler": self.bold
+                "pattern": self.BOLD_RE,
+                "handler": self.bold,
+                "start": "*_"
             },
             "italic": {
-                "pattern": r"^([\*_])([^\*\n\r]+?)\1",
-                "handler": self.italic
+                "pattern": self.ITALIC_RE,
+                "handler": self.italic,
+                "start": "*_"
             },
             "code": {
-                "pattern": r"^(`+)([\s\S]*?)\1",
-                "handler": self.code
+                "pattern": self.CODE_SPAN_RE,
+                "handler": self.code,
+                "start": "`"
             }
         }
 
@@ -149,7 +185,7 @@ class BaseExtension(Extension):
     def inline_link(self, text:'str'):
         def handle_alt(text:'str'):
             ob = 0
-            alt = ""
+            end = len(text)
             i = 0
 
             for i, char in enumerate(text):
@@ -158,11 +194,11 @@ class BaseExtension(Extension):
                 elif char == "]":
                     ob -= 1
                     if ob == 0:
+                        end = i
                         break
 
-                alt += char
-
-            return alt[1:], i+1
+            # The alt text runs up to the matching `]`, or to the end when it is never closed
+            return text[1:end], i+1
 
         def handle_link(text:'str'):
             i = 1
@@ -246,7 +282,7 @@ class BaseExtension(Extension):
         return el, i
 
     def automatic_link(self, text:'str'):
-        match = re.match(self.text_tags["automatic_link"]["pattern"], text)
+        match = self.match(self.AUTOMATIC_LINK_RE, text)
 
         assert match is not None, "Automatic link not found"
 
@@ -254,7 +290,7 @@ class BaseExtension(Extension):
         return self.create_element("a", {"class": "automatic-link", "href": url}, [self.create_text(url)]), match.end() - match.start()
 
     def reference_definition(self, text:'str'):
-        match = re.match(self.text_tags["reference_definition"]["pattern"], text)
+        match = self.match(self.REFERENCE_DEFINITION_RE, text)
         assert match is not None, "Reference definition not found"
 
         label = match.group(1)
@@ -262,7 +298,7 @@ class BaseExtension(Extension):
         return self.create_element("a", {"class": ["ref-def"], "href": url, "ref": True, "refId":label}, [self.create_text(label)])
 
     def reference(self, text:'str'):
-        match = re.match(self.text_tags["reference"]["pattern"], text)
+        match = self.match(self.REFERENCE_RE, text)
         assert match is not None, "Reference not found"
 
         label = match.group(1)
@@ -272,7 +308,7 @@ class BaseExtension(Extension):
     def image(self, text:'str'):
         def handle_alt(text:'str'):
             ob = 0
-            alt = ""
+            end = len(text)
             i = 0
 
             for i, char in enumerate(text):
@@ -281,11 +317,11 @@ class BaseExtension(Extension):
                 elif char == "]":
                     ob -= 1
                     if ob == 0:
+                        end = i
                         break
 
-                alt += char
-
-            return alt[1:], i+1
+            # The alt text runs up to the matching `]`, or to the end when it is never closed
+            return text[1:end], i+1
 
         def handle_link(text:'str'):
             i = 1
@@ -369,22 +405,22 @@ class BaseExtension(Extension):
         return el, i
 
     def bold(self, text:'str'):
-        match = re.match(self.text_tags["bold"]["pattern"], text)
+        match = self.match(self.BOLD_RE, text)
         assert match is not None, "Bold not found"
 
         content = match.group(2)
         return self.create_element("strong", children=self.parse_text(content)), match.end() - match.start()
 
     def italic(self, text:'str'):
-        match = re.match(self.text_tags["italic"]["pattern"], text)
+        match = self.match(self.ITALIC_RE, text)
         assert match is not None, "Italic not found"
 
         content = match.group(2)
         return self.create_element("em", children=self.parse_text(content)), match.end() - match.start()
 
     def bold_and_italic(self, text:'str'):
-        m1 = re.match(self.text_tags["bold_and_italic"]["pattern"][0], text)
-        m2 = re.match(self.text_tags["bold_and_italic"]["pattern"][1], text)
+        m1 = self.match(self.BOLD_AND_ITALIC_RES[0], text)
+        m2 = self.match(self.BOLD_AND_ITALIC_RES[1], text)
         match = m1 or m2
         assert match is not None, "Bold and italic not found"
 
@@ -392,7 +428,7 @@ class BaseExtension(Extension):
         return self.create_element("strong", {"class": ["italic-bold" if m1 else "bold-italic"]}, children=[self.create_element("em", children=self.parse_text(content))]), match.end() - match.start()
 
     def code(self, text:'str'):
-        match = re.match(self.text_tags["code"]["pattern"], text)
+        match = self.match(self.CODE_SPAN_RE, text)
         assert match is not None, "Code not found"
 
         return self.create_element("code", {"class": ["codespan"]}, [self.create_text(match.group(2))]), match.end() - match.start()
@@ -405,31 +441,35 @@ class BaseExtension(Extension):
         if self.block != "BLOCKQUOTE":
             self.start_block("BLOCKQUOTE", self.end_blockquote)
 
-        match = re.match(self.top_level_tags["blockquote"]["pattern"], line)
-        assert match is not None, "Blockquote not found"
+        # Lines from `parse` hold no newlines, so `BLOCKQUOTE_RE` comes down to the "> " prefix
+        assert line.startswith("> "), "Blockquote not found"
 
-        self.handle_text(match.group(1))
+        self.handle_text(line[2:])
 
     def end_blockquote(self):
-        subparser = self.parser_class()
-        children = subparser.parse(self.buffer)
+        # Blockquotes reuse one sub-parser, reset between them, instead of constructing a parser for each
+        if self.subparser is None:
+            self.subparser = self.parser_class()
+        else:
+            self.subparser.reset()
+
+        children = self.subparser.parse(self.buffer)
         return self.create_element("blockquote", children=children)
 
     # Code
 
     def handle_code(self, line: 'str'):
         if not self.parsing[0]:
+            # Closing fence, the buffered lines are the code itself
             self.end_block(parse=False)
-        else:
-            self.parsing = False, ["code"]
+            return
 
-        if self.block is None or not self.block.startswith("CODE:"):
-            match = re.match(self.top_level_tags["code"]["pattern"], line)
-            assert match is not None, "Code block not found"
-            lang = match.group(1) or ""
-            self.start_block(f"CODE:{lang}", self.end_code)
-        else:
-            self.end_block()
+        match = self.CODE_RE.match(line)
+        assert match is not None, "Code block not found"
+        lang = match.group(1) or ""
+        self.start_block(f"CODE:{lang}", self.end_code)
+        # Set after `start_block`, ending the previous block turns parsing back on
+        self.parsing = False, ["code"]
 
     def end_code(self):
         lang = self.block[5:]
@@ -440,14 +480,14 @@ class BaseExtension(Extension):
     # List
 
     def handle_ul(self, line: 'str'):
-        match = re.match(self.top_level_tags["ul"]["pattern"], line)
+        match = self.UL_RE.match(line)
         assert match is not None, "UL not found"
 
-        indent = len(match.group(1))
-        type = match.group(2)
-        input = match.group(3) != None
-        checked = match.group(3) != " "
-        contents = match.group(4) or ""
+        spaces, type, check, contents = match.groups()
+        indent = len(spaces)
+        input = check != None
+        checked = check != " "
+        contents = contents or ""
 
         if self.block != "UL":
             self.start_block("UL", self.end_list)
@@ -457,15 +497,15 @@ class BaseExtension(Extension):
         self.list_stack.append({"list":"ul", "input":input, "checked": checked, "indent": indent, "contents": contents, "type": type})
 
     def handle_ol(self, line: 'str'):
-        match = re.match(self.top_level_tags["ol"]["pattern"], line)
+        match = self.OL_RE.match(line)
         assert match is not None, "OL not found"
 
-        indent = len(match.group(1))
-        num = int(match.group(2))
-        type = match.group(3)
-        input = match.group(4) != None
-        checked = match.group(4) != " "
-        contents = match.group(5) or ""
+        spaces, num, type, check, contents = match.groups()
+        indent = len(spaces)
+        num = int(num)
+        input = check != None
+        checked = check != " "
+        contents = contents or ""
         input = False
 
         if self.block != "OL":
@@ -477,60 +517,22 @@ class BaseExtension(Extension):
 
 
     def end_list(self):
-        def data2li(item: 'UL_LIST|OL_LIST') -> 'LIST_ITEM':
-            return {
-                "data": item,
-                "dataType": "item"
-            }
-
-        lists:'list[LIST_TYPE]' = [{
-            "value": [],
-            "parent": None,
-            "type": "ul" if self.block == "UL" else "ol",
-            "key": self.list_stack[0]["type"],
-            "dataType": "list",
-            **({"start": self.list_stack[0]["num"]} if self.block == "OL" else {})
-        }]
-        
-        cur_indent = -1
-        cur_list = lists[0]
-
         list_modes:'dict[str, t.Literal["ul", "ol"]]' = {
             "-": "ul", "*": "ul", "+": "ul",
             ")": "ol", ".": "ol"
         }
 
-        for item in self.list_stack:
-            indent = item["indent"]
-            mode = list_modes[item["type"]]
-
-            if indent > cur_indent:
-                # Create new nested list
-                new_list:'LIST_TYPE' = {
-                    "value": [data2li(item)],
-                    "parent": cur_list,
-                    "type": mode,
-                    "key": item["type"],
-                    "dataType": "list",
+        def create_list(mode:'t.Literal["ul", "ol"]', item:'UL_LIST|OL_LIST') -> 'ELEMENT':
+            return self.create_element(
+                mode,
+                {
+                    "class": [f"list-{item['type']}"],
                     **({"start": item["num"]} if mode == "ol" else {})
                 }
-                cur_list["value"].append(new_list)
-                cur_list = new_list
-                cur_indent = indent
-
-            elif indent < cur_indent:
-                # Go back up the tree
-                while cur_indent > indent and cur_list["parent"] is not None:
-                    cur_list = cur_list["parent"]
-                    cur_indent -= 1
-                cur_list["value"].append(data2li(item))
-
-            else:
-                # Same level
-                cur_list["value"].append(data2li(item))
+            )
 
-        def handle_item(item:'LIST_ITEM'):
-            if item["data"]["input"]:
+        def create_item(item:'UL_LIST|OL_LIST') -> 'ELEMENT':
+            if item["input"]:
                 return self.create_element(
                     "li",
                     children=[
@@ -539,32 +541,46 @@ class BaseExtension(Extension):
                             {
                                 "class": ["checklist"],
                                 "type": "checkbox",
-                                "checked": item["data"]["checked"]
+                                "checked": item["checked"]
                             }
                         ),
-                        self.create_text(item["data"]["contents"])
+                        self.create_text(item["contents"])
                     ]
                 )
             return self.create_element(
                 "li",
-                children=[self.create_text(item["data"]["contents"])]
+                children=[self.create_text(item["contents"])]
             )
 
-        def handle_child_list(child_list:'LIST_TYPE'):
-            return self.create_element(
-                child_list["type"],
-                {
-                    "class": [f"list-{child_list['key']}"],
-                    **({"start": child_list["start"]} if child_list["type"] == "ol" else {})
-                },
-                [
-                    handle_child_list(child) if child.get("dataType") == "list" 
-                    else handle_item(child) 
-                    for child in child_list["value"]
-                ]
-            )
+        root = create_list("ul" if self.block == "UL" else "ol", self.list_stack[0])
+
+        # Lists are built in place as items arrive, the stack holds the open list and its ancestors
+        stack:'list[ELEMENT]' = [root]
+        cur_indent = -1
+
+        for item in self.list_stack:
+            indent = item["indent"]
 
-        return [handle_child_list(list) for list in lists]
+            if indent > cur_indent:
+                # Create new nested list
+                new_list = create_list(list_modes[item["type"]], item)
+                new_list["children"].append(create_item(item))
+                stack[-1]["children"].append(new_list)
+                stack.append(new_list)
+                cur_indent = indent
+
+            elif indent < cur_indent:
+                # Go back up the tree
+                while cur_indent > indent and len(stack) > 1:
+                    stack.pop()
+                    cur_indent -= 1
+                stack[-1]["children"].append(create_item(item))
+
+            else:
+                # Same level
+                stack[-1]["children"].append(create_item(item))
+
+        return [root]
 
     # Table
 
@@ -602,15 +618,18 @@ class BaseExtension(Extension):
                 else:
                     self.tcols.append("justify")
 
-    def end_table(self):
-        head = [h.strip() for h in self.thead.removeprefix("|").removesuffix("|").split("|")]
-
-        body = [
-            [
-                cell.strip() for cell in row.removeprefix("|").removesuffix("|").split("|")
-            ] for row in self.table
+    @classmethod
+    def split_row(cls, row: 'str') -> 'list[str]':
+        # Split on unescaped pipes only, an escaped `\|` is a literal pipe inside the cell
+        return [
+            cell.strip().replace("\\|", "|")
+            for cell in cls.CELL_SPLIT_RE.split(row.removeprefix("|").removesuffix("|"))
         ]
 
+    def end_table(self):
+        head = self.split_row(self.thead)
+        body = [self.split_row(row) for row in self.table]
+
         return self.create_element(
                 "table",
                 children=[
@@ -620,7 +639,7 @@ class BaseExtension(Extension):
                             self.create_element(
                                 "tr",
                                 children=[
-                                    self.create_element("th", {"class": [f"list-{style}"]}, [self.create_text(cell.strip())]) for cell, style in zip(head, self.tcols)
+                                    self.create_element("th", {"class": [f"list-{style}"]}, [self.create_text(cell)]) for cell, style in zip(head, self.tcols)
                                 ]
                             )
                         ]
@@ -631,7 +650,7 @@ class BaseExtension(Extension):
                             self.create_element(
                                 "tr",
                                 children=[
-                                    self.create_element("td", {"class": [f"list-{style}"]},[self.create_text(cell.strip())]) for cell, style in zip(row, self.tcols)
+                                    self.create_element("td", {"class": [f"list-{style}"]},[self.create_text(cell)]) for cell, style in zip(row, self.tcols)
                                 ]
                             ) for row in body
                         ]
@@ -649,13 +668,13 @@ class BaseExtension(Extension):
 
     def handle_h(self, line: 'str'):
         self.end_block()
-        match = re.match(self.top_level_tags["h"]["pattern"], line)
-        assert match is not None, "Header not found"
+        # Dispatch already matched `H_RE`, count the `#`s by hand instead of matching it again
+        level = len(line) - len(line.lstrip("#"))
+        assert 1 <= level <= 6 and line[level:level + 1] in ("", " "), "Header not found"
 
-        level = len(match.group(1))
-        content = match.group(2)
+        content = line[level + 1:]
 
-        return self.create_element(f"h{level}", {"id": content.replace(" ", "-")}, children=[self.create_text(content)])
+        return self.create_element(self.HEADINGS[level - 1], {"id": content.replace(" ", "-")}, children=[self.create_text(content)])
 
     # Horizontal rule
 
@@ -665,7 +684,7 @@ class BaseExtension(Extension):
 
     def handle_title(self, line: 'str'):
         self.end_block()
-        match = re.match(self.top_level_tags["title"]["pattern"], line)
+        match = self.TITLE_RE.match(line)
         assert match is not None, "Title not found"
 
         title = match.group(1)
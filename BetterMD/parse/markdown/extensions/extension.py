@@ -1,4 +1,5 @@
 import typing as t
+import re
 from abc import ABC, abstractmethod
 
 if t.TYPE_CHECKING:
@@ -51,6 +52,9 @@ class Extension(ABC):
     def parsing(self, value:'tuple[bool, list[str]]'):
         self.parser.parsing = value
 
+    def match(self, pattern:'re.Pattern[str]', text:'str') -> 't.Optional[re.Match[str]]':
+        return self.parser.match(pattern, text)
+
     def create_text(self, content:'str'):
         return self.parser.create_text(content)
 
@@ -1,12 +1,19 @@
 import re
-from ..typing import ELEMENT, TEXT
 import typing as t
 
+T = t.TypeVar("T")
+
 if t.TYPE_CHECKING:
+    from ..typing import ELEMENT, TEXT
     from .typing import ELM_TYPE_W_END, ELM_TYPE_WO_END, ELM_TEXT
     from . import Extension
 
 class MDParser:
+    # Backreferences and conditionals would point at the wrong groups once patterns are fused together
+    UNFUSABLE_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+    # Fused alternations by the patterns they join, shared by every parser so a refresh doesn't rebuild them
+    fused_cache:'dict[tuple[re.Pattern[str], ...], tuple[t.Optional[re.Pattern[str]], tuple[int, ...]]]' = {}
+
     extensions:'list[type[Extension]]' = []
     top_level_tags:'dict[str, t.Union[ELM_TYPE_W_END, ELM_TYPE_WO_END]]' = {}
     text_tags:'dict[str, ELM_TEXT]' = {}
@@ -28,6 +35,7 @@ class MDParser:
     def refresh_extensions(self):
         self.top_level_tags = {}
         self.text_tags = {}
+        self.exts = []
 
         for extension in self.extensions:
             ext = extension(MDParser)
@@ -36,22 +44,177 @@ class MDParser:
             self.text_tags.update(ext.text_tags)
             self.exts.append(ext)
 
+        # Compile every pattern once here instead of going through `re`'s cache on each line or character
+        self.top_level_patterns:'list[tuple[str, re.Pattern[str], t.Union[ELM_TYPE_W_END, ELM_TYPE_WO_END]]]' = [
+            (tag, re.compile(handler["pattern"]), handler) for tag, handler in self.top_level_tags.items()
+        ]
+        self.text_patterns:'list[tuple[str, tuple[re.Pattern[str], ...], ELM_TEXT]]' = [
+            (
+                tag,
+                tuple(re.compile(pattern) for pattern in handler["pattern"]) if isinstance(handler["pattern"], list) else (re.compile(handler["pattern"]),),
+                handler
+            ) for tag, handler in self.text_tags.items()
+        ]
+
+        self.top_level_re, self.top_level_groups = self.fuse_patterns(self.top_level_patterns)
+        self.text_start_re = self.start_chars_re(self.text_patterns)
+        # Fused patterns for the tags a block restricts parsing to, keyed by those tags
+        self.restricted_res:'dict[tuple[str, ...], tuple[t.Optional[re.Pattern[str]], dict[int, tuple[str, re.Pattern[str], t.Union[ELM_TYPE_W_END, ELM_TYPE_WO_END]]]]]' = {}
+
+    @classmethod
+    def fuse_patterns(cls, patterns:'list[tuple[str, re.Pattern[str], T]]') -> 'tuple[t.Optional[re.Pattern[str]], dict[int, tuple[str, re.Pattern[str], T]]]':
+        """
+        Join `^`-anchored patterns into a single alternation, so one match finds the first of them to match a line.
+
+        Returns the fused pattern and a map from the group wrapping each alternative (the match's `lastindex`)
+        to its entry, or `None` and an empty map when any pattern can't be fused safely.
+        """
+        key = tuple(entry[1] for entry in patterns)
+        try:
+            fused, indexes = cls.fused_cache[key]
+        except KeyError:
+            fused, indexes = cls.fused_cache[key] = cls.join_patterns(key)
+
+        if fused is None:
+            return None, {}
+
+        return fused, dict(zip(indexes, patterns))
+
+    @classmethod
+    def join_patterns(cls, patterns:'tuple[re.Pattern[str], ...]') -> 'tuple[t.Optional[re.Pattern[str]], tuple[int, ...]]':
+        # The alternation for `fuse_patterns`, with the index of the group wrapping each pattern
+        indexes = []
+        alternatives = []
+        index = 1
+
+        for pattern in patterns:
+            if pattern.flags != re.UNICODE or not cls.is_anchored(pattern.pattern) or cls.UNFUSABLE_RE.search(pattern.pattern):
+                return None, ()
+
+            indexes.append(index)
+            alternatives.append(f"({pattern.pattern})")
+            index += pattern.groups + 1
+
+        if not alternatives:
+            return None, ()
+
+        try:
+            return re.compile("|".join(alternatives)), tuple(indexes)
+        except re.error:
+            return None, ()
+
+    @staticmethod
+    def start_chars_re(patterns:'list[tuple[str, tuple[re.Pattern[str], ...], ELM_TEXT]]') -> 't.Optional[re.Pattern[str]]':
+        """
+        Build a character class of every character the given text tags can start with, from their `start` hints.
+
+        Returns `None` when a tag has no hint, since it could then start anywhere.
+        """
+        chars = set()
+        for _, _, handler in patterns:
+            if "start" not in handler:
+                return None
+            chars.update(handler["start"])
+
+        if not chars:
+            return None
+
+        return re.compile("[" + "".join(re.escape(char) for char in sorted(chars)) + "]")
+
+    @staticmethod
+    def is_anchored(pattern:'str') -> 'bool':
+        # `^` has to lead the pattern and govern all of it, so no `|` may appear outside a group
+        if not pattern.startswith("^"):
+            return False
+
+        depth = 0
+        in_class = False
+        i = 1
+        while i < len(pattern):
+            char = pattern[i]
+            if char == "\\":
+                i += 2
+                continue
+
+            if in_class:
+                if char == "]":
+                    in_class = False
+            elif char == "[":
+                in_class = True
+                # A `]` straight after `[` or `[^` is a literal
+                if pattern.startswith("^", i + 1):
+                    i += 1
+                if pattern.startswith("]", i + 1):
+                    i += 1
+            elif char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char == "|" and depth == 0:
+                return False
+            i += 1
+
+        return True
+
+    def find_top_level(self, line:'str') -> 't.Optional[t.Union[ELM_TYPE_W_END, ELM_TYPE_WO_END]]':
+        if self.parsing[0]:
+            fused, groups = self.top_level_re, self.top_level_groups
+        else:
+            tags = tuple(self.parsing[1])
+            try:
+                fused, groups = self.restricted_res[tags]
+            except KeyError:
+                fused, groups = self.restricted_res[tags] = self.fuse_patterns(
+                    [entry for entry in self.top_level_patterns if entry[0] in tags]
+                )
+
+        if fused is not None:
+            # One match over the fused patterns, `lastindex` is the group of the alternative that matched
+            match = fused.match(line)
+            return None if match is None else groups[match.lastindex][2]
+
+        for tag, pattern, handler in self.top_level_patterns:
+            if (not self.parsing[0]) and (tag not in self.parsing[1]):
+                continue
+            if pattern.search(line):
+                return handler
+
+        return None
+
     def __init__(self):
         self.exts:'list[Extension]' = []
         self.reset()
+        self.refresh_extensions()
 
     def reset(self):
         self.dom:'list[ELEMENT|TEXT]' = []
-        self.buffer = ""
+        # Buffered lines, only joined when the buffer is read
+        self.lines:'list[str]' = []
         self.end_func:'t.Optional[t.Callable[[], None]]' = None
         self.dom_stack = []
         self.head = []
         self.block = None
         self.parsing:'tuple[bool, list[str]]' = True, [] # bool - is parsing, list[str] - tags
+        self.last_match:'t.Optional[re.Match[str]]' = None
 
         for extension in self.exts:
             extension.init(self)
 
+    def match(self, pattern:'re.Pattern[str]', text:'str') -> 't.Optional[re.Match[str]]':
+        # Handlers re-match the text they were dispatched with, hand them the match `parse_text` already made
+        match = self.last_match
+        if match is not None and match.re is pattern and match.string is text:
+            return match
+        return pattern.match(text)
+
+    @property
+    def buffer(self) -> 'str':
+        return "\n".join(self.lines)
+
+    @buffer.setter
+    def buffer(self, value:'str'):
+        self.lines = [value] if value else []
+
     @staticmethod
     def create_element(name:'str', attrs:'dict[str, t.Union[str, bool, int, float]]'=None, children:'list[ELEMENT|TEXT]'=None) -> 'ELEMENT':
         if children is None:
@@ -76,16 +239,17 @@ class MDParser:
         }
 
     def end_block(self, parse=True):
-        if self.buffer and parse:
+        if self.lines and parse:
             self.dom.append(self.parse_text(self.buffer))
 
-        if self.end_func is None:
-            return
+        if self.end_func is not None:
+            self.dom.append(self.end_func())
+            self.end_func = None
+            self.block = None
+            self.parsing = True, []
 
-        self.dom.append(self.end_func())
-        self.end_func = None
-        self.block = None
-        self.parsing = True, []
+        # The buffered lines have been flushed, the next block starts from an empty buffer
+        self.lines.clear()
 
     def start_block(self, block, end_func=None):
         self.end_block()
@@ -95,30 +259,25 @@ class MDParser:
     # Text
 
     def handle_text(self, line: 'str'):
-        # Buffer text content for paragraph handling
-        if self.buffer:
-            self.buffer += '\n' + line
-        else:
-            self.buffer = line
+        # Buffer text content for paragraph handling, leading empty lines leave the buffer empty
+        if line or self.lines:
+            self.lines.append(line)
 
     def parse(self, markdown: 'str') -> 'list[ELEMENT]':
         self.refresh_extensions()
+        find_top_level = self.find_top_level
+        handle_text = self.handle_text
 
         for line in markdown.splitlines():
             # Check for block-level elements
-            for tag, handler in self.top_level_tags.items():
-                if (not self.parsing[0]) and (tag not in self.parsing[1]):
-                    continue
-                if re.search(handler["pattern"], line):
-                    if handler["end"] is not None:
-                        handler["handler"](line)
-                    else:
-                        self.dom.append(handler["handler"](line))
-                    break
-
-            else:
+            handler = find_top_level(line)
+            if handler is None:
                 # Regular text gets buffered for paragraph handling
-                self.handle_text(line)
+                handle_text(line)
+            elif handler["end"] is not None:
+                handler["handler"](line)
+            else:
+                self.dom.append(handler["handler"](line))
 
         # End any remaining block
         self.end_block()
@@ -134,56 +293,57 @@ class MDParser:
         return dom
 
     def parse_text(self, text: 'str') -> 'list[ELEMENT | TEXT]':
-        self.refresh_extensions()
-        plain_text = ""
         dom = []
         i = 0
+        length = len(text)
+        # Plain text is always the run from `plain_start` up to `i`, sliced out when it ends
+        plain_start = 0
 
-        def handle(pattern, handler):
-            if re.match(pattern, text[i:]):
-                return True, *handler(text[i:])
-
-            return False, None, 0
+        if self.parsing[0]:
+            start_re = self.text_start_re
+        else:
+            start_re = self.start_chars_re([entry for entry in self.text_patterns if entry[0] in self.parsing[1]])
+
+        while i < length:
+            if start_re is not None:
+                # No tag can match before the next character one of them starts with
+                match = start_re.search(text, i)
+                end = length if match is None else match.start()
+                if end > i:
+                    i = end
+                    continue
 
-        while i < len(text):
-            for tag, handler in self.text_tags.items():
+            # Handlers take the rest of the text, slice it once per position rather than per pattern
+            rest = text[i:]
+            for tag, patterns, handler in self.text_patterns:
                 if not self.parsing[0] and tag not in self.parsing[1]:
                     continue
 
-                if isinstance(handler["pattern"], list):
-                    b = False
-                    for pattern in handler["pattern"]:
-                        v, elm, l = handle(pattern, handler["handler"])
-                        if v:
-                            if plain_text:
-                                dom.append(self.create_text(plain_text))
-                                plain_text = ""
-
-                            dom.append(elm)
-                            i += l
-                            b = True
-                            break
-                    if b:
-                        break
-                else:
-                    v, elm, l = handle(handler["pattern"], handler["handler"])
-                    if v:
-                        if plain_text:
-                            dom.append(self.create_text(plain_text))
-                            plain_text = ""
-                        
+                b = False
+                for pattern in patterns:
+                    match = pattern.match(rest)
+                    if match:
+                        self.last_match = match
+                        elm, l = handler["handler"](rest)
+                        if plain_start < i:
+                            dom.append(self.create_text(text[plain_start:i]))
+
                         dom.append(elm)
                         i += l
+                        b = True
                         break
+                if b:
+                    break
 
             else:
-                plain_text += text[i]
+                i += 1
+                continue
 
             i += 1
+            plain_start = i
 
-        if plain_text:
-            dom.append(self.create_text(plain_text))
-            plain_text = ""
+        if plain_start < length:
+            dom.append(self.create_text(text[plain_start:]))
 
         return dom
 
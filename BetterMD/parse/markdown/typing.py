@@ -1,23 +1,25 @@
 import typing as t
+import re
 
 if t.TYPE_CHECKING:
     from .parser import MDParser
     from ..typing import ELEMENT, TEXT
 
 class ELM_TYPE_W_END(t.TypedDict):
-    pattern: 't.Union[str, list[str]]'
+    pattern: 't.Union[str, re.Pattern[str], list[t.Union[str, re.Pattern[str]]]]'
     handler: 't.Callable[[str], None | t.NoReturn]'
     end: 't.Callable[[], None]'
 
 
 class ELM_TYPE_WO_END(t.TypedDict):
-    pattern: 't.Union[str, list[str]]'
+    pattern: 't.Union[str, re.Pattern[str], list[t.Union[str, re.Pattern[str]]]]'
     handler: 't.Callable[[str], ELEMENT]'
     end: 'None'
 
 class ELM_TEXT(t.TypedDict):
-    pattern: 't.Union[str, list[str]]'
+    pattern: 't.Union[str, re.Pattern[str], list[t.Union[str, re.Pattern[str]]]]'
     handler: 't.Callable[[str], tuple[TEXT | ELEMENT, int]]'
+    start: 't.NotRequired[str]' # Every character a match can start with, lets the parser skip ahead to them
 
 class OL_LIST(t.TypedDict):
     list: 't.Literal["ol"]'
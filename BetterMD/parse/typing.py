@@ -32,6 +32,11 @@ class ELEMENT(t.TypedDict):
     attributes: 'ATTRS'
     children: 'list[t.Union[ELEMENT, TEXT]]'
 
+EVENT = t.Union[
+    'tuple[t.Literal["open"], str, ATTRS, bool]',
+    'tuple[t.Literal["close", "text", "raw", "comment", "declaration"], str]'
+]
+
 @t.runtime_checkable
 class Parser(t.Protocol):
     def parse(self, html:'str') -> 'list[ELEMENT]': ...
\ No newline at end of file
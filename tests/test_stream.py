@@ -0,0 +1,109 @@
+import os
+import time
+
+from BetterMD.parse import HTMLParser
+
+# Streaming a document in chunks should cost a constant factor of tokenizing it in one go,
+# even when a single token (comment, raw tag body, text run, attribute value) spans thousands of chunks
+
+CHUNK = 4096
+FACTOR = 25
+
+documents = {
+    "comment": "<!--" + "x" * 4_000_000 + "-->",
+    "script": "<script>" + "var a = 1 < 2;\n" * 250_000 + "</script>",
+    "text": "y" * 4_000_000 + "<b>",
+    "declaration": "<!" + "d" * 2_000_000 + ">",
+    "closing tag": "</" + "c" * 2_000_000 + ">",
+    "attribute": '<a href="' + "h" * 2_000_000 + '">',
+    "attribute with >": '<img src="data:image/svg+xml,' + "<svg><g></g></svg>" * 150_000 + '" alt=x>',
+    "script attribute with >": "<script data-x='" + "a>b" * 500_000 + "'>" + "1 > 0;\n" * 250_000 + "</script>",
+}
+
+class CountingPattern:
+    """Wraps a compiled pattern, adding up how many characters its matches span."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.scanned = 0
+
+    def match(self, string, pos=0):
+        match = self.pattern.match(string, pos)
+        if match is not None:
+            self.scanned += match.end() - pos
+        return match
+
+class CountingParser(HTMLParser):
+    """Counts the scanning work done while tokenizing."""
+
+    def __init__(self):
+        super().__init__()
+        self.ATTR_RE = CountingPattern(HTMLParser.ATTR_RE)
+        self.TAG_NAME_RE = CountingPattern(HTMLParser.TAG_NAME_RE)
+        self.reads = 0
+
+    @property
+    def scanned(self):
+        return self.ATTR_RE.scanned + self.TAG_NAME_RE.scanned
+
+    def read_opening_tag(self, html, start):
+        self.reads += 1
+        return super().read_opening_tag(html, start)
+
+    def read_closing_tag(self, html, start):
+        self.reads += 1
+        return super().read_closing_tag(html, start)
+
+    def read_comment(self, html, start):
+        self.reads += 1
+        return super().read_comment(html, start)
+
+def chunked(html):
+    return [html[i:i + CHUNK] for i in range(0, len(html), CHUNK)]
+
+def test_chunked_matches_one_shot():
+    parser = HTMLParser()
+    for name, html in documents.items():
+        assert list(parser.iter_events(chunked(html))) == list(parser.events(html)), name
+
+def test_chunked_scanning_work():
+    for name, html in documents.items():
+        one_shot = CountingParser()
+        list(one_shot.events(html))
+        streamed = CountingParser()
+        list(streamed.iter_events(chunked(html)))
+
+        # Each token is read once, however many chunks it spans
+        assert streamed.reads == one_shot.reads, f"{name}: {streamed.reads} reads, {one_shot.reads} in one go"
+        # Tag scanning resumes where the previous chunk stopped rather than starting over
+        assert streamed.scanned <= 2 * one_shot.scanned + len(html) // CHUNK * CHUNK, f"{name}: scanned {streamed.scanned} characters"
+
+def test_chunked_timing():
+    # Wall-clock ratios are noisy on shared machines, so this only runs when asked for
+    if not os.environ.get("BETTERMD_STREAM_TIMING"):
+        return
+
+    def best_of(func, runs=3):
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    parser = HTMLParser()
+    for name, html in documents.items():
+        chunks = chunked(html)
+        one_shot = best_of(lambda: list(parser.events(html)))
+        streamed = best_of(lambda: list(parser.iter_events(chunks)))
+        print(f"{name}: one-shot {one_shot * 1000:.1f}ms, chunked {streamed * 1000:.1f}ms")
+
+        # The floor keeps inputs that tokenize in well under a millisecond from tripping on timer noise
+        assert streamed <= FACTOR * max(one_shot, 0.001), f"{name}: chunked parsing is {streamed / one_shot:.0f}x slower"
+
+if __name__ == "__main__":
+    os.environ.setdefault("BETTERMD_STREAM_TIMING", "1")
+    test_chunked_matches_one_shot()
+    test_chunked_scanning_work()
+    test_chunked_timing()